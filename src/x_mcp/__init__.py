@@ -1,9 +1,16 @@
 from . import server
 import asyncio
 
+try:
+    import uvloop
+except ImportError:
+    # uvloop is not available on Windows, fall back to the default event loop
+    uvloop = None
+
 def main():
     """Main entry point for the package."""
-    asyncio.run(server.main())
+    loop_factory = uvloop.new_event_loop if uvloop is not None else None
+    asyncio.run(server.main(), loop_factory=loop_factory)
 
 # Optionally expose other important items at package level
 __all__ = ['main', 'server']
@@ -1,11 +1,20 @@
 import os
-import json
 import logging
+import mimetypes
 import asyncio
+import time
+import uuid
+import aiofiles
+import aiofiles.os
+import aiosqlite
+import fastjsonschema
+import orjson
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import Any, Sequence
+from typing import Any, Awaitable, Callable, Sequence
 from dotenv import load_dotenv
 import tweepy
+from requests.adapters import HTTPAdapter
 from mcp.server import Server
 from mcp.types import (
     Tool,
@@ -48,116 +57,294 @@ auth = tweepy.OAuth1UserHandler(
 # API instance for media uploads
 api = tweepy.API(auth)
 
+# Reuse pooled keep-alive connections to the X API across calls made from worker threads
+for session in (client.session, api.session):
+    session.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=10, max_retries=3))
+
+class TokenBucket:
+    """
+    Token bucket rate limiter for X API calls.
+    - capacity: Maximum number of calls that can be made in a burst
+    - refill_rate: Tokens added back per second
+    """
+
+    def __init__(self, capacity: int, refill_rate: float):
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = max(now - self.updated_at, 0.0)
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_rate)
+        self.updated_at = now
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it."""
+        async with self._lock:
+            delay = self.blocked_until - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._refill()
+            if self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.refill_rate)
+                self._refill()
+            self.tokens -= 1
+
+    def block_until(self, reset_at: float) -> None:
+        """
+        Hold all callers until the X rate-limit window resets.
+        - reset_at: Unix timestamp from the x-rate-limit-reset header
+        """
+        self.blocked_until = time.monotonic() + max(reset_at - time.time(), 1.0)
+        # One token for the first call after the reset; refill only counts time from then on
+        self.tokens = 1.0
+        self.updated_at = self.blocked_until
+
+# Matches the X API v2 tweet posting limit of 50 requests per 15 minutes
+tweet_bucket = TokenBucket(capacity=50, refill_rate=50 / (15 * 60))
+
+# Longest rate-limit reset worth waiting for; longer windows (e.g. the daily cap) fail fast
+MAX_RATE_LIMIT_WAIT = 15 * 60
+
+async def create_tweet(**kwargs) -> tweepy.Response:
+    """
+    Post a tweet from a worker thread, respecting the posting rate limit.
+    - kwargs: Arguments passed through to tweepy.Client.create_tweet
+    If X answers with 429, retries once after the rate-limit window resets,
+    provided the reset is at most MAX_RATE_LIMIT_WAIT seconds away.
+    """
+    for attempt in range(2):
+        await tweet_bucket.acquire()
+        try:
+            return await asyncio.to_thread(client.create_tweet, **kwargs)
+        except tweepy.TooManyRequests as e:
+            reset_header = e.response.headers.get("x-rate-limit-reset")
+            reset_at = float(reset_header) if reset_header else time.time() + 60
+            if attempt or reset_at - time.time() > MAX_RATE_LIMIT_WAIT:
+                raise
+            tweet_bucket.block_until(reset_at)
+            logger.warning("Rate limited by X API, retrying after reset at %s", reset_at)
+
 server = Server("x_mcp")
 
-# List available tools
-@server.list_tools()
-async def list_tools() -> list[Tool]:
-    """List available tools for interacting with Twitter/X."""
-    return [
-        Tool(
-            name="create_draft_tweet",
-            description="Create a draft tweet",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "content": {
-                        "type": "string",
-                        "description": "The content of the tweet",
-                    },
+# SQLite database holding all drafts, opened on first use and kept open while serving
+DB_PATH = "drafts.db"
+_db: aiosqlite.Connection | None = None
+_db_lock = asyncio.Lock()
+
+# In-memory index of drafts keyed by draft ID, loaded lazily from the database
+_DRAFT_CACHE: dict[str, dict] = {}
+_CACHE_LOADED = False
+_cache_lock = asyncio.Lock()
+
+# Per-draft locks with reference counts, so publish/delete of the same draft
+# serialize while operations on different drafts run concurrently
+_draft_locks: dict[str, tuple[asyncio.Lock, int]] = {}
+
+@asynccontextmanager
+async def draft_lock(draft_id: str):
+    """
+    Hold the lock for a single draft, dropping it once no one is waiting on it.
+    - draft_id: ID of the draft
+    """
+    lock, count = _draft_locks.get(draft_id, (None, 0))
+    if lock is None:
+        lock = asyncio.Lock()
+    _draft_locks[draft_id] = (lock, count + 1)
+    try:
+        async with lock:
+            yield
+    finally:
+        lock, count = _draft_locks[draft_id]
+        if count == 1:
+            del _draft_locks[draft_id]
+        else:
+            _draft_locks[draft_id] = (lock, count - 1)
+
+# Tweets longer than this are rejected by X, so refuse them when the draft is created
+MAX_TWEET_LENGTH = 280
+
+# Tool definitions never change, so build them once at import
+_TOOLS: list[Tool] = [
+    Tool(
+        name="create_draft_tweet",
+        description="Create a draft tweet",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "content": {
+                    "type": "string",
+                    "maxLength": MAX_TWEET_LENGTH,
+                    "description": "The content of the tweet",
                 },
-                "required": ["content"],
             },
-        ),
-        Tool(
-            name="create_draft_thread",
-            description="Create a draft tweet thread",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "contents": {
-                        "type": "array",
-                        "items": {"type": "string"},
-                        "description": "An array of tweet contents for the thread",
-                    },
+            "required": ["content"],
+        },
+    ),
+    Tool(
+        name="create_draft_thread",
+        description="Create a draft tweet thread",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "contents": {
+                    "type": "array",
+                    "items": {"type": "string", "maxLength": MAX_TWEET_LENGTH},
+                    "description": "An array of tweet contents for the thread",
                 },
-                "required": ["contents"],
             },
-        ),
-        Tool(
-            name="list_drafts",
-            description="List all draft tweets and threads",
-            inputSchema={
-                "type": "object",
-                "properties": {},
-                "required": [],
-            },
-        ),
-        Tool(
-            name="publish_draft",
-            description="Publish a draft tweet or thread",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "draft_id": {
-                        "type": "string",
-                        "description": "ID of the draft to publish",
-                    },
+            "required": ["contents"],
+        },
+    ),
+    Tool(
+        name="list_drafts",
+        description="List all draft tweets and threads",
+        inputSchema={
+            "type": "object",
+            "properties": {},
+            "required": [],
+        },
+    ),
+    Tool(
+        name="publish_draft",
+        description="Publish a draft tweet or thread",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "draft_id": {
+                    "type": "string",
+                    "description": "ID of the draft to publish",
                 },
-                "required": ["draft_id"],
             },
-        ),
-        Tool(
-            name="delete_draft",
-            description="Delete a draft tweet or thread",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "draft_id": {
-                        "type": "string",
-                        "description": "ID of the draft to delete",
-                    },
+            "required": ["draft_id"],
+        },
+    ),
+    Tool(
+        name="delete_draft",
+        description="Delete a draft tweet or thread",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "draft_id": {
+                    "type": "string",
+                    "description": "ID of the draft to delete",
                 },
-                "required": ["draft_id"],
             },
-        ),
-        Tool(
-            name="upload_media_and_tweet",
-            description="Upload a media file (GIF/PNG/JPEG etc.) and create a tweet draft",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "media_path": {
-                        "type": "string",
-                        "description": "The file path of the media to upload",
-                    },
-                    "tweet_text": {
-                        "type": "string",
-                        "description": "The text content of the tweet",
-                    },
+            "required": ["draft_id"],
+        },
+    ),
+    Tool(
+        name="upload_media_and_tweet",
+        description="Upload a media file (GIF/PNG/JPEG etc.) and create a tweet draft",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "media_path": {
+                    "type": "string",
+                    "description": "The file path of the media to upload",
+                },
+                "tweet_text": {
+                    "type": "string",
+                    "maxLength": MAX_TWEET_LENGTH,
+                    "description": "The text content of the tweet",
                 },
-                "required": ["media_path", "tweet_text"],
             },
-        ),
-    ]
+            "required": ["media_path", "tweet_text"],
+        },
+    ),
+]
+
+# Argument validators compiled once from the tool input schemas
+_VALIDATORS = {tool.name: fastjsonschema.compile(tool.inputSchema) for tool in _TOOLS}
+
+# List available tools
+@server.list_tools()
+async def list_tools() -> list[Tool]:
+    """List available tools for interacting with Twitter/X."""
+    return _TOOLS
 
 @server.call_tool()
 async def call_tool(name: str, arguments: Any) -> Sequence[TextContent]:
     """Handle tool calls for creating Twitter/X drafts."""
-    if name == "create_draft_tweet":
-        return await handle_create_draft_tweet(arguments)
-    elif name == "create_draft_thread":
-        return await handle_create_draft_thread(arguments)
-    elif name == "list_drafts":
-        return await handle_list_drafts(arguments)
-    elif name == "publish_draft":
-        return await handle_publish_draft(arguments)
-    elif name == "delete_draft":
-        return await handle_delete_draft(arguments)
-    elif name == "upload_media_and_tweet":
-        return await handle_upload_media_and_tweet(arguments)
-    else:
+    handler = _HANDLERS.get(name)
+    if handler is None:
         raise ValueError(f"Unknown tool: {name}")
+    try:
+        _VALIDATORS[name](arguments)
+    except fastjsonschema.JsonSchemaException as e:
+        raise ValueError(f"Invalid arguments for {name}: {e.message}")
+    return await handler(arguments)
+
+# Size of each APPEND segment in chunked media uploads (X allows up to 5 MB)
+MEDIA_CHUNK_SIZE = 4 * 1024 * 1024
+
+def sniff_media_type(header: bytes) -> str | None:
+    """
+    Detect the media type from the first bytes of a file.
+    - header: At least the first 12 bytes of the file
+    Returns None if the format is not recognized.
+    """
+    if header.startswith((b"GIF87a", b"GIF89a")):
+        return "image/gif"
+    if header.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if header.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if header.startswith(b"RIFF") and header[8:12] == b"WEBP":
+        return "image/webp"
+    if header[4:8] == b"ftyp":
+        return "video/quicktime" if header[8:12] == b"qt  " else "video/mp4"
+    return None
+
+async def chunked_upload(file_path: str) -> tweepy.models.Media:
+    """
+    Upload media to Twitter with the chunked INIT/APPEND/FINALIZE endpoints.
+    - file_path: Path to the media file
+    Only one segment of the file is held in memory at a time.
+    """
+    filename = os.path.basename(file_path)
+    async with aiofiles.open(file_path, "rb") as f:
+        # Trust the file contents over its extension, like tweepy's media_upload
+        media_type = sniff_media_type(await f.read(12))
+        await f.seek(0)
+        if media_type is None:
+            media_type, _ = mimetypes.guess_type(file_path)
+        if media_type is None:
+            raise ValueError(f"Unsupported media type for {file_path}")
+        if media_type == "image/gif":
+            media_category = "tweet_gif"
+        elif media_type.startswith("video/"):
+            media_category = "tweet_video"
+        else:
+            media_category = "tweet_image"
+
+        total_bytes = os.fstat(f.fileno()).st_size
+        media = await asyncio.to_thread(
+            api.chunked_upload_init, total_bytes, media_type, media_category=media_category
+        )
+        media_id = media.media_id
+
+        segment_index = 0
+        while chunk := await f.read(MEDIA_CHUNK_SIZE):
+            await asyncio.to_thread(
+                api.chunked_upload_append, media_id, (filename, chunk), segment_index
+            )
+            segment_index += 1
+
+    media = await asyncio.to_thread(api.chunked_upload_finalize, media_id)
+
+    # GIFs and videos are processed asynchronously after FINALIZE
+    while getattr(media, "processing_info", {}).get("state") in ("pending", "in_progress"):
+        await asyncio.sleep(media.processing_info["check_after_secs"])
+        media = await asyncio.to_thread(api.get_media_upload_status, media_id)
+    if getattr(media, "processing_info", {}).get("state") == "failed":
+        raise tweepy.TweepyException(f"Media processing failed: {media.processing_info.get('error')}")
+
+    return media
 
 async def upload_media(file_path: str) -> str:
     """
@@ -165,27 +352,133 @@ async def upload_media(file_path: str) -> str:
     - file_path: Path to the media file
     """
     try:
-        media = api.media_upload(file_path)
+        media = await chunked_upload(file_path)
         return media.media_id_string
     except tweepy.TweepyException as e:
-        logger.error(f"Twitter API error during media upload: {e}")
+        logger.error("Twitter API error during media upload: %s", e)
         raise RuntimeError(f"Media upload error: {e}")
 
+async def import_legacy_drafts(db: aiosqlite.Connection) -> None:
+    """
+    Move drafts saved as JSON files in the drafts directory into the database.
+    - db: Open database connection
+    """
+    try:
+        filenames = await aiofiles.os.listdir("drafts")
+    except FileNotFoundError:
+        return
+    for filename in filenames:
+        filepath = os.path.join("drafts", filename)
+        try:
+            async with aiofiles.open(filepath, "rb") as f:
+                draft = orjson.loads(await f.read())
+            created_at = await aiofiles.os.path.getmtime(filepath)
+        except (OSError, ValueError) as e:
+            logger.warning("Skipping unreadable draft %s: %s", filename, e)
+            continue
+        await db.execute(
+            "INSERT OR IGNORE INTO drafts VALUES (?, ?, ?)",
+            (filename, orjson.dumps(draft).decode(), created_at),
+        )
+        await db.commit()
+        await aiofiles.os.remove(filepath)
+        logger.info("Imported legacy draft: %s", filename)
+
+async def get_db() -> aiosqlite.Connection:
+    """
+    Return the shared database connection, opening it on first use.
+    """
+    global _db
+    async with _db_lock:
+        if _db is None:
+            db = await aiosqlite.connect(DB_PATH)
+            await db.execute("PRAGMA journal_mode=WAL")
+            # Sync the WAL on every commit so a saved draft survives a crash or power loss
+            await db.execute("PRAGMA synchronous=FULL")
+            await db.execute(
+                "CREATE TABLE IF NOT EXISTS drafts(id TEXT PRIMARY KEY, payload TEXT, created_at REAL)"
+            )
+            await db.commit()
+            await import_legacy_drafts(db)
+            _db = db
+    return _db
+
+async def close_db() -> None:
+    """
+    Close the shared database connection if it is open.
+    """
+    global _db
+    async with _db_lock:
+        if _db is not None:
+            await _db.close()
+            _db = None
+
+async def save_draft(draft_id: str, draft: dict, created_at: float) -> None:
+    """
+    Insert a draft into the database.
+    - draft_id: ID of the draft
+    - draft: Draft payload
+    - created_at: Unix timestamp of when the draft was created
+    """
+    db = await get_db()
+    async with _cache_lock:
+        await db.execute(
+            "INSERT INTO drafts VALUES (?, ?, ?)",
+            (draft_id, orjson.dumps(draft).decode(), created_at),
+        )
+        await db.commit()
+        _DRAFT_CACHE[draft_id] = draft
+
+async def fetch_draft(draft_id: str) -> dict | None:
+    """
+    Read a single draft from the database.
+    - draft_id: ID of the draft
+    Returns None if there is no such draft.
+    """
+    db = await get_db()
+    async with db.execute("SELECT payload FROM drafts WHERE id = ?", (draft_id,)) as cursor:
+        row = await cursor.fetchone()
+    return orjson.loads(row[0]) if row is not None else None
+
+async def remove_draft(draft_id: str) -> bool:
+    """
+    Delete a draft from the database and drop it from the draft cache.
+    - draft_id: ID of the draft
+    Returns False if there was no such draft.
+    """
+    db = await get_db()
+    async with _cache_lock:
+        cursor = await db.execute("DELETE FROM drafts WHERE id = ?", (draft_id,))
+        await db.commit()
+        _DRAFT_CACHE.pop(draft_id, None)
+    return cursor.rowcount > 0
+
+async def load_drafts() -> None:
+    """
+    Populate the draft cache from the database on first use.
+    """
+    global _CACHE_LOADED
+    db = await get_db()
+    async with _cache_lock:
+        if _CACHE_LOADED:
+            return
+        async with db.execute("SELECT id, payload FROM drafts ORDER BY created_at") as cursor:
+            async for draft_id, payload in cursor:
+                _DRAFT_CACHE[draft_id] = orjson.loads(payload)
+        _CACHE_LOADED = True
+
 async def handle_create_draft_tweet(arguments: Any) -> Sequence[TextContent]:
     """
-    Create a draft for a regular text tweet and save it to a file.
+    Create a draft for a regular text tweet and save it to the database.
     - arguments: {"content": "<tweet content>"}
     """
-    if not isinstance(arguments, dict) or "content" not in arguments:
-        raise ValueError("Invalid arguments for create_draft_tweet")
     content = arguments["content"]
     try:
-        draft = {"content": content, "timestamp": datetime.now().isoformat()}
-        os.makedirs("drafts", exist_ok=True)
-        draft_id = f"draft_{int(datetime.now().timestamp())}.json"
-        with open(os.path.join("drafts", draft_id), "w") as f:
-            json.dump(draft, f, indent=2)
-        logger.info(f"Draft tweet created: {draft_id}")
+        now = time.time()
+        draft = {"content": content, "timestamp": datetime.fromtimestamp(now).isoformat()}
+        draft_id = f"draft_{int(now)}_{uuid.uuid4().hex[:8]}.json"
+        await save_draft(draft_id, draft, now)
+        logger.info("Draft tweet created: %s", draft_id)
         return [
             TextContent(
                 type="text",
@@ -193,26 +486,21 @@ async def handle_create_draft_tweet(arguments: Any) -> Sequence[TextContent]:
             )
         ]
     except Exception as e:
-        logger.error(f"Error creating draft tweet: {str(e)}")
+        logger.error("Error creating draft tweet: %s", e)
         raise RuntimeError(f"Error creating draft tweet: {str(e)}")
 
 async def handle_create_draft_thread(arguments: Any) -> Sequence[TextContent]:
     """
-    Create a draft for a thread of multiple tweets and save it to a file.
+    Create a draft for a thread of multiple tweets and save it to the database.
     - arguments: {"contents": ["tweet1","tweet2",...]}
     """
-    if not isinstance(arguments, dict) or "contents" not in arguments:
-        raise ValueError("Invalid arguments for create_draft_thread")
     contents = arguments["contents"]
-    if not isinstance(contents, list) or not all(isinstance(item, str) for item in contents):
-        raise ValueError("Invalid contents for create_draft_thread")
     try:
-        draft = {"contents": contents, "timestamp": datetime.now().isoformat()}
-        os.makedirs("drafts", exist_ok=True)
-        draft_id = f"thread_draft_{int(datetime.now().timestamp())}.json"
-        with open(os.path.join("drafts", draft_id), "w") as f:
-            json.dump(draft, f, indent=2)
-        logger.info(f"Draft thread created: {draft_id}")
+        now = time.time()
+        draft = {"contents": contents, "timestamp": datetime.fromtimestamp(now).isoformat()}
+        draft_id = f"thread_draft_{int(now)}_{uuid.uuid4().hex[:8]}.json"
+        await save_draft(draft_id, draft, now)
+        logger.info("Draft thread created: %s", draft_id)
         return [
             TextContent(
                 type="text",
@@ -220,29 +508,25 @@ async def handle_create_draft_thread(arguments: Any) -> Sequence[TextContent]:
             )
         ]
     except Exception as e:
-        logger.error(f"Error creating draft thread: {str(e)}")
+        logger.error("Error creating draft thread: %s", e)
         raise RuntimeError(f"Error creating draft thread: {str(e)}")
 
 async def handle_list_drafts(arguments: Any) -> Sequence[TextContent]:
     """
-    List all tweet and thread drafts saved in the drafts directory.
+    List all tweet and thread drafts saved in the database.
     """
     try:
-        drafts = []
-        if os.path.exists("drafts"):
-            for filename in os.listdir("drafts"):
-                filepath = os.path.join("drafts", filename)
-                with open(filepath, "r") as f:
-                    draft = json.load(f)
-                drafts.append({"id": filename, "draft": draft})
+        if not _CACHE_LOADED:
+            await load_drafts()
+        drafts = [{"id": draft_id, "draft": draft} for draft_id, draft in _DRAFT_CACHE.items()]
         return [
             TextContent(
                 type="text",
-                text=json.dumps(drafts, indent=2),
+                text=orjson.dumps(drafts, option=orjson.OPT_INDENT_2).decode(),
             )
         ]
     except Exception as e:
-        logger.error(f"Error listing drafts: {str(e)}")
+        logger.error("Error listing drafts: %s", e)
         raise RuntimeError(f"Error listing drafts: {str(e)}")
 
 async def handle_publish_draft(arguments: Any) -> Sequence[TextContent]:
@@ -250,112 +534,93 @@ async def handle_publish_draft(arguments: Any) -> Sequence[TextContent]:
     Publish a draft to Twitter.
     - Determines whether it's a single tweet or thread based on the draft content.
     """
-    if not isinstance(arguments, dict) or "draft_id" not in arguments:
-        raise ValueError("Invalid arguments for publish_draft")
-    
     draft_id = arguments["draft_id"]
-    filepath = os.path.join("drafts", draft_id)
     
-    if not os.path.exists(filepath):
-        raise ValueError(f"Draft {draft_id} does not exist")
+    async with draft_lock(draft_id):
+        draft = await fetch_draft(draft_id)
+        if draft is None:
+            raise ValueError(f"Draft {draft_id} does not exist")
     
-    try:
-        with open(filepath, "r") as f:
-            draft = json.load(f)
-        
-        # Single tweet
-        if "content" in draft:
-            content = draft["content"]
-            media_ids = None
+        try:
+            # Single tweet
+            if "content" in draft:
+                content = draft["content"]
+                media_ids = None
             
-            # Regular draft with media path (images etc.)
-            if "media_path" in draft:
-                media_id = await upload_media(draft["media_path"])
-                media_ids = [media_id]
-            # Case where media ID is directly included (including GIFs)
-            elif "media_id" in draft:
-                media_ids = [draft["media_id"]]
+                # Regular draft with media path (images etc.)
+                if "media_path" in draft:
+                    media_id = await upload_media(draft["media_path"])
+                    media_ids = [media_id]
+                # Case where media ID is directly included (including GIFs)
+                elif "media_id" in draft:
+                    media_ids = [draft["media_id"]]
                 
-            response = client.create_tweet(text=content, media_ids=media_ids)
-            tweet_id = response.data['id']
-            logger.info(f"Published tweet ID {tweet_id}")
+                response = await create_tweet(text=content, media_ids=media_ids)
+                tweet_id = response.data['id']
+                logger.info("Published tweet ID %s", tweet_id)
             
-            # Delete draft file after posting is complete
-            os.remove(filepath)
+                # Delete draft after posting is complete
+                await remove_draft(draft_id)
             
-            return [
-                TextContent(
-                    type="text",
-                    text=f"Draft {draft_id} published as tweet ID {tweet_id}",
-                )
-            ]
+                return [
+                    TextContent(
+                        type="text",
+                        text=f"Draft {draft_id} published as tweet ID {tweet_id}",
+                    )
+                ]
         
-        # Thread
-        elif "contents" in draft:
-            contents = draft["contents"]
-            last_tweet_id = None
-            for content in contents:
-                if last_tweet_id is None:
-                    response = client.create_tweet(text=content)
-                else:
-                    response = client.create_tweet(text=content, in_reply_to_tweet_id=last_tweet_id)
-                last_tweet_id = response.data['id']
-                # Sleep to avoid rate limits
-                await asyncio.sleep(1)
+            # Thread
+            elif "contents" in draft:
+                contents = draft["contents"]
+                last_tweet_id = None
+                for content in contents:
+                    response = await create_tweet(text=content, in_reply_to_tweet_id=last_tweet_id)
+                    last_tweet_id = response.data['id']
             
-            logger.info(f"Published thread starting with tweet ID {last_tweet_id}")
-            os.remove(filepath)
+                logger.info("Published thread starting with tweet ID %s", last_tweet_id)
+                await remove_draft(draft_id)
             
-            return [
-                TextContent(
-                    type="text",
-                    text=f"Draft {draft_id} published as thread starting with tweet ID {last_tweet_id}",
-                )
-            ]
-        else:
-            raise ValueError(f"Invalid draft format for {draft_id}")
-    except tweepy.TweepyException as e:
-        logger.error(f"Twitter API error: {e}")
-        raise RuntimeError(f"Error publishing draft {draft_id}: {e}")
-    except Exception as e:
-        logger.error(f"Error publishing draft {draft_id}: {str(e)}")
-        raise RuntimeError(f"Error publishing draft {draft_id}: {str(e)}")
+                return [
+                    TextContent(
+                        type="text",
+                        text=f"Draft {draft_id} published as thread starting with tweet ID {last_tweet_id}",
+                    )
+                ]
+            else:
+                raise ValueError(f"Invalid draft format for {draft_id}")
+        except tweepy.TweepyException as e:
+            logger.error("Twitter API error: %s", e)
+            raise RuntimeError(f"Error publishing draft {draft_id}: {e}")
+        except Exception as e:
+            logger.error("Error publishing draft %s: %s", draft_id, e)
+            raise RuntimeError(f"Error publishing draft {draft_id}: {str(e)}")
 
 async def handle_upload_media_and_tweet(arguments: Any) -> Sequence[TextContent]:
     """
     Upload a generic media file (GIF/PNG/JPEG etc.) and create a draft tweet with it.
     - arguments: {"media_path": "<media file path>", "tweet_text": "<tweet text>"}
     """
-    if not isinstance(arguments, dict) or "media_path" not in arguments or "tweet_text" not in arguments:
-        raise ValueError("Invalid arguments for upload_media_and_tweet")
-    
     media_path = arguments["media_path"]
     tweet_text = arguments["tweet_text"]
     
-    if not os.path.exists(media_path):
-        raise ValueError(f"Media file {media_path} does not exist")
-    
     try:
         # Upload media to Twitter
-        media = api.media_upload(filename=media_path)
+        media = await chunked_upload(media_path)
         media_id = media.media_id_string
         
         # Create draft
+        now = time.time()
         draft = {
             "content": tweet_text,
             "media_id": media_id,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": datetime.fromtimestamp(now).isoformat()
         }
         
-        # Create drafts directory
-        os.makedirs("drafts", exist_ok=True)
-        
-        # Save draft file
-        draft_id = f"media_draft_{int(datetime.now().timestamp())}.json"
-        with open(os.path.join("drafts", draft_id), "w") as f:
-            json.dump(draft, f, indent=2)
+        # Save draft
+        draft_id = f"media_draft_{int(now)}_{uuid.uuid4().hex[:8]}.json"
+        await save_draft(draft_id, draft, now)
         
-        logger.info(f"Draft tweet with media created: {draft_id}")
+        logger.info("Draft tweet with media created: %s", draft_id)
         
         return [
             TextContent(
@@ -368,7 +633,7 @@ async def handle_upload_media_and_tweet(arguments: Any) -> Sequence[TextContent]
             )
         ]
     except tweepy.TweepyException as e:
-        logger.error(f"Twitter API error: {e}")
+        logger.error("Twitter API error: %s", e)
         error_details = str(e)
         return [
             TextContent(
@@ -376,46 +641,57 @@ async def handle_upload_media_and_tweet(arguments: Any) -> Sequence[TextContent]
                 text=f"Error creating draft tweet with media: {error_details}",
             )
         ]
+    except FileNotFoundError:
+        raise ValueError(f"Media file {media_path} does not exist")
     except Exception as e:
-        logger.error(f"Error creating draft tweet with media: {str(e)}")
+        logger.error("Error creating draft tweet with media: %s", e)
         raise RuntimeError(f"Error creating draft tweet with media: {str(e)}")
 
 async def handle_delete_draft(arguments: Any) -> Sequence[TextContent]:
     """
-    Delete a specific draft file.
-    - arguments: {"draft_id": "<draft file name>"}
+    Delete a specific draft.
+    - arguments: {"draft_id": "<draft ID>"}
     """
-    if not isinstance(arguments, dict) or "draft_id" not in arguments:
-        raise ValueError("Invalid arguments for delete_draft")
-    
     draft_id = arguments["draft_id"]
-    filepath = os.path.join("drafts", draft_id)
     
-    try:
-        if not os.path.exists(filepath):
-            raise ValueError(f"Draft {draft_id} does not exist")
+    async with draft_lock(draft_id):
+        try:
+            if not await remove_draft(draft_id):
+                raise ValueError(f"Draft {draft_id} does not exist")
         
-        os.remove(filepath)
-        logger.info(f"Deleted draft: {draft_id}")
+            logger.info("Deleted draft: %s", draft_id)
         
-        return [
-            TextContent(
-                type="text",
-                text=f"Successfully deleted draft {draft_id}",
-            )
-        ]
-    except Exception as e:
-        logger.error(f"Error deleting draft {draft_id}: {str(e)}")
-        raise RuntimeError(f"Error deleting draft {draft_id}: {str(e)}")
+            return [
+                TextContent(
+                    type="text",
+                    text=f"Successfully deleted draft {draft_id}",
+                )
+            ]
+        except Exception as e:
+            logger.error("Error deleting draft %s: %s", draft_id, e)
+            raise RuntimeError(f"Error deleting draft {draft_id}: {str(e)}")
+
+# Tool name to handler mapping used by call_tool
+_HANDLERS: dict[str, Callable[[Any], Awaitable[Sequence[TextContent]]]] = {
+    "create_draft_tweet": handle_create_draft_tweet,
+    "create_draft_thread": handle_create_draft_thread,
+    "list_drafts": handle_list_drafts,
+    "publish_draft": handle_publish_draft,
+    "delete_draft": handle_delete_draft,
+    "upload_media_and_tweet": handle_upload_media_and_tweet,
+}
 
 async def main():
     import mcp
-    async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
-        await server.run(
-            read_stream,
-            write_stream,
-            server.create_initialization_options(),
-        )
+    try:
+        async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
+            await server.run(
+                read_stream,
+                write_stream,
+                server.create_initialization_options(),
+            )
+    finally:
+        await close_db()
 
 if __name__ == "__main__":
     import asyncio